@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+batch_tracks - look up many discs and stream their tracks to disk
+
+Reads MusicBrainz disc IDs (one per line) from a file or stdin and writes
+the tracks of each disc's first matching release (as cdrip.py picks) as
+they're produced, so memory use stays flat however many discs are in the
+batch. Every row carries its disc and release ID. Output is appended to:
+a rerun after an interruption skips discs already written and redoes
+any disc that was cut short.
+
+    batch_tracks.py discids.txt tracks.jsonl
+    batch_tracks.py discids.txt tracks.sqlite
+"""
+
+import argparse
+import sys
+
+import musicbrainzngs
+
+from cdrip import iter_releases, iter_tracks_from_release
+from track_stream import (TrackRow, resume_jsonl, sqlite_disc_ids,
+                          write_jsonl, write_sqlite)
+
+
+def iter_disc_ids(f):
+    """Yield disc IDs from an open file, skipping blanks and # comments."""
+    for line in f:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def iter_batch_discs(disc_ids, done=()):
+    """Yield a list of TrackRows for each disc ID in turn.
+
+    Uses the first release MusicBrainz returns for the disc, as cdrip.py
+    does, so reissues and regional editions don't repeat the disc. Disc
+    IDs in done are skipped; discs whose lookup fails or finds nothing
+    are reported and skipped.
+    """
+    for disc_id in disc_ids:
+        if disc_id in done:
+            continue
+        try:
+            releases = list(iter_releases(disc_id))
+        except musicbrainzngs.WebServiceError as e:
+            print(f"{disc_id}: lookup failed: {e}", file=sys.stderr)
+            continue
+        if not releases:
+            print(f"{disc_id}: no release found", file=sys.stderr)
+            continue
+
+        release = releases[0]
+        yield [TrackRow(disc_id, release["id"], *track)
+               for track in iter_tracks_from_release(release)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("discids", type=argparse.FileType("r"),
+                        help="file of disc IDs, or - for stdin")
+    parser.add_argument("output",
+                        help="output file; .sqlite/.db for SQLite, "
+                             "anything else for JSON lines. Either kind "
+                             "is appended to, skipping discs already in it")
+    args = parser.parse_args()
+
+    disc_ids = iter_disc_ids(args.discids)
+    if args.output.endswith((".sqlite", ".db")):
+        done = sqlite_disc_ids(args.output)
+        discs = iter_batch_discs(disc_ids, done)
+        count = write_sqlite(discs, args.output)
+    else:
+        done = resume_jsonl(args.output)
+        discs = iter_batch_discs(disc_ids, done)
+        with open(args.output, "a") as f:
+            count = write_jsonl(discs, f)
+    if done:
+        print(f"{len(done)} disc(s) already in {args.output} were skipped")
+    print(f"Wrote {count} tracks to {args.output}")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Estimate find_dupes.py run time on a large library.
+
+Decoding 100k real files isn't practical for a benchmark, so this times
+the two halves separately and extrapolates:
+
+  1. Per-file cost: read_tags() and analyze() on a few synthetic FLAC and
+     MP3 files made with ffmpeg.
+  2. Library-scale cost: tier-1 grouping and fingerprint matching on
+     LIBRARY_SIZE synthetic index rows, with a known share of duplicates
+     under varied titles. This also gives the number of candidates that
+     would actually be decoded, and recall per kind of title variant.
+     Copies given an unrelated title are included on purpose: tier 1
+     never groups them, so they are expected to be missed.
+"""
+
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+import wave
+from collections import defaultdict
+
+import numpy as np
+
+import find_dupes as fd
+
+LIBRARY_SIZE = 100000
+DUPLICATE_SHARE = 0.10   # fraction of the library that copies another track
+TITLE_VARIANTS = {
+    "same title": "{}",
+    "suffix": "{} (Remastered)",
+    "artist prefix": "Artist - {}",
+    "unrelated title": None,   # a fresh random title
+}
+SAMPLE_FILES = 20
+SAMPLE_SECONDS = 60
+
+
+def make_sample_files(tmp):
+    """Write SAMPLE_FILES tagged FLAC/MP3 files; return their paths."""
+    rng = np.random.default_rng(0)
+    paths = []
+    for n in range(SAMPLE_FILES):
+        wav = os.path.join(tmp, f"{n}.wav")
+        t = np.arange(44100 * SAMPLE_SECONDS) / 44100
+        tone = np.sin(2 * np.pi * rng.uniform(100, 900) * t)
+        noise = rng.normal(0, 0.2, len(t))
+        pcm = (np.clip(tone * 0.5 + noise, -1, 1) * 32767).astype("<i2")
+        with wave.open(wav, "wb") as w:
+            w.setnchannels(2)
+            w.setsampwidth(2)
+            w.setframerate(44100)
+            w.writeframes(np.repeat(pcm, 2).tobytes())
+
+        ext = ".flac" if n % 2 else ".mp3"
+        path = os.path.join(tmp, f"{n:02d} - Artist - Title {n}{ext}")
+        subprocess.run(
+            ["ffmpeg", "-v", "quiet", "-y", "-i", wav,
+             "-metadata", f"title=Title {n}", "-metadata", "artist=Artist",
+             path], check=True)
+        os.remove(wav)
+        paths.append(path)
+    return paths
+
+
+def time_per_file(func, paths):
+    """Median seconds per call of func(path)."""
+    times = []
+    for path in paths:
+        start = time.perf_counter()
+        func(path)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def synthetic_library(n, frames=422):
+    """Build n index rows sorted by duration, with DUPLICATE_SHARE copies.
+
+    Copies get a little duration jitter, a TITLE_VARIANTS title and ~10%
+    of their fingerprint bits flipped; originals get random prints. Each
+    row records the recording it holds and, for copies, the variant used.
+    """
+    rng = random.Random(0)
+    words = [f"w{k}" for k in range(3000)]
+    originals = int(n * (1 - DUPLICATE_SHARE))
+    rows = []
+    for i in range(originals):
+        title = " ".join(rng.choices(words, k=rng.randint(1, 4)))
+        fp = np.random.default_rng(i).integers(0, 2**32, frames,
+                                               dtype=np.uint32)
+        rows.append({"path": f"/lib/{i}.flac", "title": title,
+                     "duration": rng.uniform(90, 480), "fp": fp,
+                     "recording": i, "variant": None})
+    for i in range(originals, n):
+        src = rows[rng.randrange(originals)]
+        variant = rng.choice(list(TITLE_VARIANTS))
+        pattern = TITLE_VARIANTS[variant]
+        if pattern is None:
+            title = " ".join(rng.choices(words, k=rng.randint(1, 4)))
+        else:
+            title = pattern.format(src["title"])
+        noise = np.random.default_rng(i).random((frames, 32)) < 0.10
+        flips = np.packbits(noise, axis=1).view(">u4").ravel()
+        rows.append({"path": f"/old/{i}.mp3", "title": title,
+                     "recording": src["recording"], "variant": variant,
+                     "duration": src["duration"] + rng.uniform(-0.3, 0.3),
+                     "fp": src["fp"] ^ flips.astype(np.uint32)})
+
+    rows.sort(key=lambda r: r["duration"])
+    for r in rows:
+        r.update(artist="", album="", trackid="", discid="", tracknumber="",
+                 start_sha1=None, fingerprint=None)
+    return rows
+
+
+if __name__ == "__main__":
+    workers = os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Encoding {SAMPLE_FILES} sample files...")
+        paths = make_sample_files(tmp)
+        tag_secs = time_per_file(fd.read_tags, paths)
+        decode_secs = time_per_file(fd.analyze, paths)
+    print(f"  read_tags: {tag_secs * 1000:6.1f} ms/file")
+    print(f"  analyze:   {decode_secs * 1000:6.1f} ms/file")
+    print()
+
+    print(f"Building {LIBRARY_SIZE} synthetic index rows...")
+    tracks = synthetic_library(LIBRARY_SIZE)
+
+    start = time.perf_counter()
+    tagged = list(fd.tag_matches(tracks))
+    skip = {i for members, _ in fd.cluster(len(tracks), tagged)
+            for i in members[1:]}
+    groups = fd.candidate_groups(tracks, skip)
+    tier1_secs = time.perf_counter() - start
+    candidates = {i for group in groups for i in group}
+
+    for i in candidates:
+        tracks[i]["start_sha1"] = tracks[i]["path"]
+        tracks[i]["fingerprint"] = tracks[i]["fp"].astype("<u4").tobytes()
+
+    start = time.perf_counter()
+    pairs = tagged + list(fd.pcm_matches(tracks, groups))
+    pairs += list(fd.fingerprint_matches(tracks, groups))
+    clusters = fd.cluster(len(tracks), pairs)
+    match_secs = time.perf_counter() - start
+
+    # A copy counts as found if it shares a cluster with its original
+    cluster_of = {i: c for c, (members, _) in enumerate(clusters)
+                  for i in members}
+    original = {t["recording"]: i for i, t in enumerate(tracks)
+                if t["variant"] is None}
+    planted = defaultdict(int)
+    found = defaultdict(int)
+    for i, t in enumerate(tracks):
+        if t["variant"] is not None:
+            planted[t["variant"]] += 1
+            c = cluster_of.get(i)
+            if c is not None and c == cluster_of.get(original[t["recording"]]):
+                found[t["variant"]] += 1
+    mixed = sum(1 for members, _ in clusters
+                if len({tracks[i]["recording"] for i in members}) > 1)
+
+    print(f"  candidates: {len(candidates)} "
+          f"({len(candidates) / LIBRARY_SIZE:.0%} of library)")
+    print(f"  tier 1:     {tier1_secs:6.1f} s")
+    print(f"  matching:   {match_secs:6.1f} s")
+    print(f"  recall:     {sum(found.values())} of {sum(planted.values())} "
+          f"planted copies ({mixed} clusters mix recordings)")
+    for variant in TITLE_VARIANTS:
+        print(f"    {variant:<16} {found[variant]:>6} of {planted[variant]}")
+    print()
+
+    tags_total = LIBRARY_SIZE * tag_secs / workers
+    decode_total = len(candidates) * decode_secs / workers
+    total = tags_total + decode_total + tier1_secs + match_secs
+    print(f"Estimated first run on {LIBRARY_SIZE} tracks, {workers} workers:")
+    print(f"  tags {tags_total / 60:.1f} min + decode "
+          f"{decode_total / 60:.1f} min + grouping/matching "
+          f"{(tier1_secs + match_secs) / 60:.1f} min "
+          f"= {total / 60:.1f} min")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Benchmark flac encode time vs. output size on synthetic PCM."""
+
+import math
+import os
+import random
+import subprocess
+import tempfile
+import time
+import wave
+from array import array
+
+from rip_cd import flac_encode_cmd
+
+SAMPLE_RATE = 44100
+SECONDS = 30
+LEVELS = range(0, 9)
+BLOCK_SIZES = [0, 1152, 2304, 4096, 4608]   # 0 = flac's default
+
+
+def write_synthetic_wav(path, seconds=SECONDS):
+    """Write a CD-format (16-bit stereo 44.1 kHz) WAV of tones plus noise.
+
+    Pure tones compress unrealistically well, so a little noise is mixed in
+    to keep the numbers closer to real music.
+    """
+    rng = random.Random(0)
+    freqs = (110.0, 220.0, 329.6, 440.0, 659.3)
+    samples = array("h")
+    for n in range(SAMPLE_RATE * seconds):
+        t = n / SAMPLE_RATE
+        tone = sum(math.sin(2 * math.pi * f * t) for f in freqs) / len(freqs)
+        left = tone * 12000 + rng.gauss(0, 600)
+        right = tone * 11000 + rng.gauss(0, 600)
+        samples.append(max(-32768, min(32767, int(left))))
+        samples.append(max(-32768, min(32767, int(right))))
+
+    with wave.open(path, "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(samples.tobytes())
+
+
+def encode(wav_file, flac_file, level, blocksize):
+    """Encode once with sample tags; return elapsed seconds."""
+    tags = {"title": "Synthetic", "artist": "bench_flac", "tracknumber": "1"}
+    cmd = flac_encode_cmd(wav_file, flac_file, tags,
+                          level=level, blocksize=blocksize)
+    cmd[1:1] = ["--silent", "--force"]
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_file = os.path.join(tmp, "synthetic.wav")
+        flac_file = os.path.join(tmp, "synthetic.flac")
+
+        print(f"Generating {SECONDS}s of synthetic PCM...")
+        write_synthetic_wav(wav_file)
+        wav_size = os.path.getsize(wav_file)
+        print()
+
+        print(f"{'level':>5} {'block':>6} {'secs':>7} {'x rt':>6} "
+              f"{'bytes':>10} {'ratio':>6}")
+        for level in LEVELS:
+            for blocksize in BLOCK_SIZES:
+                elapsed = encode(wav_file, flac_file, level, blocksize)
+                size = os.path.getsize(flac_file)
+                print(f"{level:>5} {blocksize or 'auto':>6} {elapsed:7.2f} "
+                      f"{SECONDS / elapsed:6.0f} {size:>10} "
+                      f"{size / wav_size:6.3f}")
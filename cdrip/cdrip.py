@@ -7,6 +7,7 @@ import discid
 import musicbrainzngs
 import os
 import discogs_client
+from track_stream import Track
 
 
 def get_disc_id(device="/dev/cdrom"):
@@ -23,22 +24,26 @@ def print_disc_info(disc):
     print()
 
 
-def lookup_musicbrainz(disc):
-    """Query MusicBrainz with disc ID, return release info."""
+def iter_releases(disc_id):
+    """Yield MusicBrainz releases for a disc ID one at a time."""
     musicbrainzngs.set_useragent("cdrip", "0.1", "randre@gmail.com")
-    
+
     result = musicbrainzngs.get_releases_by_discid(
-        disc.id,
+        disc_id,
         includes=["artists", "recordings"])
-    
-    if "disc" in result:
-        releases = result["disc"]["release-list"]
-    elif "cdstub" in result:
-        print("Found a CD stub (unverified entry)")
-        return None
-    else:
-        return None
-    return releases
+
+    if "disc" not in result:
+        if "cdstub" in result:
+            print("Found a CD stub (unverified entry)")
+        return
+
+    yield from result["disc"]["release-list"]
+
+
+def lookup_musicbrainz(disc):
+    """Query MusicBrainz with disc ID, return release info."""
+    releases = list(iter_releases(disc.id))
+    return releases or None
 
 
 def print_releases(releases):
@@ -52,20 +57,20 @@ def print_releases(releases):
     print()
 
 
-def get_tracks_from_release(release):
-    """Extract track list from a MusicBrainz release."""
-    tracks = []
+def iter_tracks_from_release(release):
+    """Yield a Track for each track on a MusicBrainz release."""
+    artist = release["artist-credit-phrase"]
+    album = release["title"]
     for medium in release["medium-list"]:
-        disc_num = medium["position"]
+        disc_num = int(medium["position"])
         for track in medium["track-list"]:
-            tracks.append({
-                "disc": disc_num,
-                "number": int(track["position"]),
-                "title": track["recording"]["title"],
-                "artist": release["artist-credit-phrase"],
-                "album": release["title"],
-            })
-    return tracks
+            yield Track(disc_num, int(track["position"]),
+                        track["recording"]["title"], artist, album)
+
+
+def get_tracks_from_release(release):
+    """Extract track list from a MusicBrainz release."""
+    return list(iter_tracks_from_release(release))
 
 
 def lookup_discogs(artist, album):
@@ -112,7 +117,7 @@ def print_tracks(tracks):
     """Display track listing."""
     print("Track listing:")
     for t in tracks:
-        print(f"  {t['number']:02d} - {t['title']}")
+        print(f"  {t.number:02d} - {t.title}")
 
 
 if __name__ == "__main__":
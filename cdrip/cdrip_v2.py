@@ -4,8 +4,11 @@ cdrip - CD ripping tool with proper metadata lookup
 """
 
 import discid
+import io
 import urllib.request
 
+from track_stream import Track
+
 
 def get_disc_id(device="/dev/cdrom"):
     """Read disc and return discid object with TOC info."""
@@ -67,8 +70,19 @@ def lookup_gnudb(disc):
     return record
 
 
-def parse_gnudb_record(record):
-    """Parse a CDDB-format record into a list of track dicts.
+def split_track_artist(title, artist):
+    """Split a "Track Artist - Title" entry; return (title, artist)."""
+    if " - " in title:
+        parts = title.split(" - ", 1)
+        # Only treat as artist-title split if the first part looks like
+        # a different artist (not a subtitle or part number)
+        if parts[0] != artist and not parts[0].startswith("Part"):
+            return parts[1], parts[0]
+    return title, artist
+
+
+def iter_gnudb_tracks(record):
+    """Parse a CDDB-format record, yielding a Track per track.
 
     Expected fields in the record:
         PERFORMER or ARTIST  — album-level artist
@@ -76,54 +90,47 @@ def parse_gnudb_record(record):
         TTITLE=N             — track titles (0-indexed)
         YEAR                 — (optional) release year
 
-    Returns list of dicts with keys: disc, number, title, artist, album
+    Fields may appear in any order and tracks come out sorted by number.
+    The one difference from a plain key=value dict: a TTITLE repeated
+    over several lines is joined, per the CDDB format, rather than only
+    keeping the last line.
     """
     fields = {}
-    for line in record.strip().split("\n"):
-        if "=" in line:
-            key, _, value = line.partition("=")
-            fields[key.strip()] = value.strip()
+    track_titles = {}
+    for line in io.StringIO(record):
+        if "=" not in line:
+            continue
+        key, _, value = line.partition("=")
+        key = key.strip()
+        if key.startswith("TTITLE"):
+            # Keep inner whitespace: a continuation may split mid-word or not
+            num = int(key[6:])
+            track_titles[num] = (track_titles.get(num, "")
+                                 + value.rstrip("\r\n"))
+        else:
+            fields[key] = value.strip()
 
     # Artist: PERFORMER is preferred; fall back to ARTIST
     artist = fields.get("PERFORMER") or fields.get("ARTIST", "Unknown Artist")
     album = fields.get("ALBUM", "Unknown Album")
 
-    # Collect TTITLE entries (0-indexed in the record)
-    track_titles = {}
-    for key, value in fields.items():
-        if key.startswith("TTITLE"):
-            num = int(key.split("=")[0].replace("TTITLE", "") or key[6:])
-            track_titles[num] = value
-
-    tracks = []
     for i in sorted(track_titles):
-        # Per-track artist: some CDDB records have "Track Artist - Title"
-        title = track_titles[i]
-        track_artist = artist
-        if " - " in title:
-            parts = title.split(" - ", 1)
-            # Only treat as artist-title split if the first part looks like
-            # a different artist (not a subtitle or part number)
-            if parts[0] != artist and not parts[0].startswith("Part"):
-                track_artist = parts[0]
-                title = parts[1]
-
-        tracks.append({
-            "disc": 1,
-            "number": i + 1,          # CDDB is 0-indexed, we want 1-indexed
-            "title": title,
-            "artist": track_artist,
-            "album": album,
-        })
-
-    return tracks
+        title, track_artist = split_track_artist(track_titles[i].strip(),
+                                                 artist)
+        # CDDB is 0-indexed, we want 1-indexed
+        yield Track(1, i + 1, title, track_artist, album)
+
+
+def parse_gnudb_record(record):
+    """Parse a CDDB-format record into a list of Tracks."""
+    return list(iter_gnudb_tracks(record))
 
 
 def print_tracks(tracks):
     """Display track listing."""
     print("Track listing:")
     for t in tracks:
-        print(f"  {t['number']:02d} - {t['title']}")
+        print(f"  {t.number:02d} - {t.title}")
 
 
 if __name__ == "__main__":
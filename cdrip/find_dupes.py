@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+find_dupes - report duplicate tracks in a music library
+
+Works in tiers so that only plausible duplicates get decoded:
+
+  1. Tags and duration (header reads only). Tracks sharing a MusicBrainz
+     recording ID, or the same disc ID + track number (a TOC fingerprint),
+     are duplicates without decoding anything; only one of each such
+     cluster goes on to tier 2. The rest are candidates only if another
+     track has the same normalized title (from tags, or the file name
+     when untagged) and a duration within DURATION_TOLERANCE.
+  2. The first ANALYZE_SECONDS of each candidate are decoded once by
+     ffmpeg. That PCM is hashed as it arrives (a cheap "same start" check)
+     and folded into a compact spectral fingerprint (same recording,
+     different encode - e.g. MP3 vs FLAC). Both are only compared within
+     a candidate group, so a shared intro or leading silence alone never
+     makes two unrelated tracks match.
+
+The title gate is a deliberate trade: it keeps decoding to a fraction
+of a large library, but a copy whose title (and, if untagged, file name)
+shares nothing with the original's is never decoded, so it is missed.
+bench_dupes.py measures how much that costs.
+
+Tags, hashes and fingerprints are cached in the library index keyed on
+file size and mtime, so reruns only touch new or changed files.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import mutagen
+import numpy as np
+
+INDEX_PATH = os.path.expanduser("~/.music_index.sqlite")
+AUDIO_EXTS = (".flac", ".mp3", ".ogg", ".oga", ".opus", ".m4a", ".wav")
+
+DURATION_TOLERANCE = 1.0   # seconds; covers MP3 padding vs. the FLAC rip
+ANALYZE_SECONDS = 20       # decoded from the start of each candidate
+
+# Fingerprint: 32-bit sub-fingerprints from band energy differences
+# (Haitsma & Kalker), on mono audio decimated to 11025 Hz.
+FP_RATE = 11025
+FP_FRAME = 4096            # ~0.37 s
+FP_HOP = 512               # ~46 ms
+FP_BANDS = np.geomspace(300, 2000, 34)
+MAX_OFFSET = 8             # frames either way when aligning two prints
+MAX_BER = 0.30             # bit error rate at or below which prints match
+
+DECODE_FAILED = ""         # start_sha1 for files ffmpeg couldn't decode
+COMMIT_EVERY = 200         # index rows per commit, so an interrupted run
+                           # keeps most of its work
+
+# Exact path prefix test; LIKE would treat _ and % as wildcards and
+# ignore case, pulling in sibling directories. Paths are stored as
+# os.fsencode() bytes so names that aren't valid UTF-8 (old Latin-1
+# rips) round-trip; substr() on a BLOB counts bytes.
+UNDER_ROOT = "substr(path, 1, ?) = ?"
+
+# Bumped whenever the table changes; older indexes are rebuilt
+INDEX_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    path        BLOB PRIMARY KEY,
+    size        INTEGER,
+    mtime       REAL,
+    duration    REAL,
+    artist      TEXT,
+    title       TEXT,
+    album       TEXT,
+    trackid     TEXT,
+    discid      TEXT,
+    tracknumber TEXT,
+    start_sha1  TEXT,
+    fingerprint BLOB
+)
+"""
+
+
+def open_index(path=INDEX_PATH):
+    """Open (creating or rebuilding if needed) the library index."""
+    db = sqlite3.connect(path)
+    if db.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+        db.execute("DROP TABLE IF EXISTS tracks")
+        db.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+    db.execute(SCHEMA)
+    return db
+
+
+def root_prefix(root):
+    """Query parameters for UNDER_ROOT matching everything below root."""
+    # join adds a trailing separator unless there is one already ("/")
+    prefix = os.fsencode(os.path.join(os.path.abspath(root), ""))
+    return len(prefix), prefix
+
+
+def scan_library(root):
+    """Yield (path, size, mtime) for every audio file under root.
+
+    Files that vanish mid-scan or are broken symlinks are skipped.
+    """
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.lower().endswith(AUDIO_EXTS):
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+
+def read_tags(path):
+    """Read duration and identifying tags without decoding audio."""
+    try:
+        audio = mutagen.File(path, easy=True)
+    except Exception:
+        audio = None
+    if audio is None:
+        return path, 0.0, "", "", "", "", "", ""
+
+    def tag(key):
+        values = audio.get(key) if audio.tags is not None else None
+        return values[0].strip() if values else ""
+
+    # "3/12" -> "3"
+    tracknumber = tag("tracknumber").split("/")[0]
+    return (path, audio.info.length, tag("artist"), tag("title"),
+            tag("album"), tag("musicbrainz_trackid"),
+            tag("musicbrainz_discid"), tracknumber)
+
+
+def update_index(db, root, workers=None):
+    """Bring the index up to date with the files under root.
+
+    New or changed files get their tags re-read (and any cached
+    fingerprint dropped); files that have gone away are removed.
+    """
+    root = os.path.abspath(root)
+    cached = {os.fsdecode(path): (size, mtime)
+              for path, size, mtime in db.execute(
+        "SELECT path, size, mtime FROM tracks WHERE " + UNDER_ROOT,
+        root_prefix(root))}
+
+    seen = set()
+    stale = {}
+    for path, size, mtime in scan_library(root):
+        seen.add(path)
+        if cached.get(path) != (size, mtime):
+            stale[path] = (size, mtime)
+
+    gone = [(os.fsencode(path),) for path in cached if path not in seen]
+    db.executemany("DELETE FROM tracks WHERE path = ?", gone)
+
+    db.commit()
+
+    with ProcessPoolExecutor(workers) as pool:
+        for n, tags in enumerate(pool.map(read_tags, stale, chunksize=64), 1):
+            path = tags[0]
+            size, mtime = stale[path]
+            db.execute(
+                "INSERT OR REPLACE INTO tracks VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL, NULL)",
+                (os.fsencode(path), size, mtime) + tags[1:])
+            if n % COMMIT_EVERY == 0:
+                db.commit()
+    db.commit()
+    return len(stale), len(gone)
+
+
+def fingerprint(mono):
+    """Compute 32-bit sub-fingerprints from mono float samples at FP_RATE."""
+    if len(mono) < FP_FRAME + FP_HOP:
+        return np.zeros(0, dtype=np.uint32)
+    frames = np.lib.stride_tricks.sliding_window_view(mono, FP_FRAME)[::FP_HOP]
+    power = np.abs(np.fft.rfft(frames * np.hanning(FP_FRAME), axis=1)) ** 2
+    edges = (FP_BANDS * FP_FRAME / FP_RATE).astype(int)
+    energy = np.add.reduceat(power[:, :edges[-1]], edges[:-1], axis=1)
+    diff = energy[:, :-1] - energy[:, 1:]
+    bits = (diff[1:] - diff[:-1]) > 0
+    return np.packbits(bits, axis=1).view(">u4").ravel().astype(np.uint32)
+
+
+def analyze(path):
+    """Decode the start of a track, streaming it into a hash and fingerprint.
+
+    Only the first ANALYZE_SECONDS are hashed, so start_sha1 says two
+    tracks begin identically, not that they're identical throughout.
+
+    Returns (path, start_sha1, fingerprint bytes), or
+    (path, DECODE_FAILED, None) if ffmpeg can't decode the file.
+    """
+    cmd = ["ffmpeg", "-v", "quiet", "-i", path, "-t", str(ANALYZE_SECONDS),
+           "-f", "s16le", "-ac", "2", "-ar", "44100", "-"]
+    sha1 = hashlib.sha1()
+    decim = 44100 // FP_RATE
+    stride = 4 * decim   # bytes per decimated output sample
+    chunks = []
+    rest = b""
+
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                          stdin=subprocess.DEVNULL) as proc:
+        while True:
+            chunk = proc.stdout.read(1 << 16)
+            if not chunk:
+                break
+            sha1.update(chunk)
+            buf = rest + chunk
+            usable = len(buf) - len(buf) % stride
+            rest = buf[usable:]
+            pcm = np.frombuffer(buf[:usable], dtype="<i2")
+            # Stereo -> mono and 44.1 kHz -> 11025 Hz in one mean
+            chunks.append(pcm.reshape(-1, 2 * decim).mean(axis=1,
+                                                          dtype=np.float32))
+    if proc.returncode != 0 or not chunks:
+        return path, DECODE_FAILED, None
+
+    fp = fingerprint(np.concatenate(chunks))
+    return path, sha1.hexdigest(), fp.astype("<u4").tobytes()
+
+
+def load_tracks(db, root):
+    """Load index rows for root as a list of dicts, sorted by duration."""
+    cursor = db.execute(
+        "SELECT * FROM tracks WHERE " + UNDER_ROOT + " ORDER BY duration",
+        root_prefix(root))
+    columns = [c[0] for c in cursor.description]
+    tracks = [dict(zip(columns, row)) for row in cursor]
+    for t in tracks:
+        t["path"] = os.fsdecode(t["path"])
+    return tracks
+
+
+def normalize(text):
+    """Lowercase and drop bracketed asides and punctuation.
+
+    "Amazing Grace (Live) [2009 Remaster]" -> "amazing grace"
+    """
+    text = re.sub(r"[\(\[].*?[\)\]]", " ", text.lower())
+    return " ".join(re.findall(r"\w+", text))
+
+
+def title_keys(track):
+    """Normalized titles a track could be filed under."""
+    title = track["title"]
+    if not title:
+        # Untagged: "01 - Artist - Title.mp3" -> "Artist - Title"
+        stem = os.path.splitext(os.path.basename(track["path"]))[0]
+        title = re.sub(r"^\d+[\s.\-_]*", "", stem)
+    keys = {normalize(title)}
+    if " - " in title:
+        # Compilations often tag the title as "Track Artist - Title"
+        keys.add(normalize(title.rsplit(" - ", 1)[1]))
+    keys.discard("")
+    return keys
+
+
+def candidate_groups(tracks, skip=()):
+    """Tier 1: group tracks by normalized title and close duration.
+
+    Tracks with a shared title key are split wherever consecutive
+    durations are more than DURATION_TOLERANCE apart. tracks must be
+    sorted by duration; indices in skip are left out. Returns lists of
+    track indices, each with at least two members.
+    """
+    by_title = defaultdict(list)
+    for i, t in enumerate(tracks):
+        if i not in skip:
+            for key in title_keys(t):
+                by_title[key].append(i)
+
+    groups = []
+    for members in by_title.values():
+        run = members[:1]
+        for i, j in zip(members, members[1:]):
+            gap = tracks[j]["duration"] - tracks[i]["duration"]
+            if gap > DURATION_TOLERANCE:
+                if len(run) > 1:
+                    groups.append(run)
+                run = []
+            run.append(j)
+        if len(run) > 1:
+            groups.append(run)
+    return groups
+
+
+def fingerprint_candidates(db, tracks, groups, workers=None):
+    """Hash and fingerprint grouped candidates that aren't cached yet.
+
+    Decode failures are cached too (as DECODE_FAILED), so a broken file
+    is only retried once its size or mtime changes.
+    """
+    candidates = {i for group in groups for i in group}
+    by_path = {tracks[i]["path"]: tracks[i] for i in sorted(candidates)
+               if tracks[i]["start_sha1"] is None}
+
+    with ProcessPoolExecutor(workers) as pool:
+        results = pool.map(analyze, by_path, chunksize=8)
+        for n, (path, sha1, fp) in enumerate(results, 1):
+            db.execute(
+                "UPDATE tracks SET start_sha1 = ?, fingerprint = ? "
+                "WHERE path = ?", (sha1, fp, os.fsencode(path)))
+            by_path[path]["start_sha1"] = sha1
+            by_path[path]["fingerprint"] = fp
+            if n % COMMIT_EVERY == 0:
+                db.commit()
+    db.commit()
+    return len(candidates), len(by_path)
+
+
+def tag_matches(tracks):
+    """Tier 1: pairs sharing a recording ID or a disc ID + track number."""
+    groups = defaultdict(list)
+    for i, t in enumerate(tracks):
+        if t["trackid"]:
+            groups[("tags", t["trackid"])].append(i)
+        if t["discid"] and t["tracknumber"]:
+            groups[("toc", t["discid"], t["tracknumber"])].append(i)
+
+    for key, members in groups.items():
+        for j in members[1:]:
+            yield members[0], j, key[0]
+
+
+def pcm_matches(tracks, groups):
+    """Tier 2a: pairs in a candidate group whose decoded starts hash alike."""
+    for group in groups:
+        by_hash = defaultdict(list)
+        for i in group:
+            if tracks[i]["start_sha1"]:
+                by_hash[tracks[i]["start_sha1"]].append(i)
+
+        # Groups are in duration order, so each hash list is too; chaining
+        # neighbours within tolerance links every in-range pair via cluster()
+        for members in by_hash.values():
+            for i, j in zip(members, members[1:]):
+                if (tracks[j]["duration"]
+                        - tracks[i]["duration"]) <= DURATION_TOLERANCE:
+                    yield i, j, "same start"
+
+
+def bit_error_rate(a, b):
+    """Lowest bit error rate between two prints over small alignments."""
+    best = 1.0
+    for offset in range(-MAX_OFFSET, MAX_OFFSET + 1):
+        x = a[max(offset, 0):]
+        y = b[max(-offset, 0):]
+        n = min(len(x), len(y))
+        if n < 2 * MAX_OFFSET:
+            continue
+        errors = np.unpackbits((x[:n] ^ y[:n]).view(np.uint8)).sum()
+        best = min(best, errors / (32 * n))
+    return best
+
+
+def fingerprint_matches(tracks, groups):
+    """Tier 2b: pairs within a candidate group whose fingerprints match."""
+    compared = set()
+    for group in groups:
+        for a, i in enumerate(group):
+            for j in group[a + 1:]:
+                if (tracks[j]["duration"]
+                        - tracks[i]["duration"]) > DURATION_TOLERANCE:
+                    break
+                if (i, j) in compared:
+                    continue
+                compared.add((i, j))
+                fi, fj = tracks[i]["fingerprint"], tracks[j]["fingerprint"]
+                if not (fi and fj):
+                    continue
+                ber = bit_error_rate(np.frombuffer(fi, dtype="<u4"),
+                                     np.frombuffer(fj, dtype="<u4"))
+                if ber <= MAX_BER:
+                    yield i, j, "fingerprint"
+
+
+def cluster(n, pairs):
+    """Union-find pairs into clusters; return list of (members, kinds)."""
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    pairs = list(pairs)
+    for i, j, _ in pairs:
+        parent[find(i)] = find(j)
+
+    members = defaultdict(set)
+    kinds = defaultdict(set)
+    for i, j, kind in pairs:
+        root = find(i)
+        members[root].update((i, j))
+        kinds[root].add(kind)
+    return [(sorted(members[root]), kinds[root]) for root in members]
+
+
+def display_path(path):
+    """A printable form of path, with undecodable bytes replaced."""
+    return os.fsencode(path).decode("utf-8", "replace")
+
+
+def print_report(tracks, clusters):
+    """Display duplicate clusters, largest first."""
+    print(f"Found {len(clusters)} duplicate cluster(s):")
+    for n, (members, kinds) in enumerate(
+            sorted(clusters, key=lambda c: -len(c[0])), 1):
+        print()
+        print(f"  {n}. {len(members)} tracks, matched by "
+              f"{', '.join(sorted(kinds))}")
+        for i in members:
+            t = tracks[i]
+            print(f"     {t['duration']:7.1f}s  {t['artist']} - {t['title']}")
+            print(f"               {display_path(t['path'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("library", help="root directory of the music library")
+    parser.add_argument("--index", default=INDEX_PATH,
+                        help=f"library index (default: {INDEX_PATH})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    if shutil.which("ffmpeg") is None:
+        sys.exit("ffmpeg not found on PATH; it's needed to decode candidates")
+
+    db = open_index(args.index)
+
+    print("Updating library index...")
+    changed, removed = update_index(db, args.library, args.workers)
+    print(f"  {changed} new/changed, {removed} removed")
+
+    tracks = load_tracks(db, args.library)
+    tagged = list(tag_matches(tracks))
+    # Keep one track per tag-matched cluster to stand in for the rest
+    skip = {i for members, _ in cluster(len(tracks), tagged)
+            for i in members[1:]}
+    groups = candidate_groups(tracks, skip)
+
+    print(f"Fingerprinting candidates among {len(tracks)} tracks...")
+    candidates, decoded = fingerprint_candidates(db, tracks, groups,
+                                                 args.workers)
+    print(f"  {candidates} candidates, {decoded} decoded, the rest cached")
+    print()
+
+    pairs = tagged
+    pairs.extend(pcm_matches(tracks, groups))
+    pairs.extend(fingerprint_matches(tracks, groups))
+    print_report(tracks, cluster(len(tracks), pairs))
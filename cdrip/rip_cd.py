@@ -1,6 +1,5 @@
 import os
 import subprocess
-from mutagen.flac import FLAC
 
 raw = ['John Doan - Amazing Grace (Part)\r', 
        'Paul McCandless - Maria Walks Among the Thorns\r', 
@@ -22,30 +21,80 @@ album = "Best of Hearts of Space, No. 3 Innocence"
 year = "2009"
 genre = "New Age"
 output_dir = "./Scratch"
+cover_file = os.path.join(output_dir, "cover.jpg")   # embedded if present
 
-os.makedirs(output_dir, exist_ok=True)
+# Encoder settings
+compression_level = 8   # 0 (fastest) .. 8 (smallest), 8 == --best
+block_size = 0          # samples per block; 0 lets flac choose
+padding_headroom = 4096  # padding on top of room to rewrite every tag once
 
-for i, (artist, title) in enumerate(tracks, start=1):
-    wav_file = os.path.join(output_dir, f"track{i:02d}.wav")
-    flac_file = os.path.join(output_dir, f"{i:02d} - {artist} - {title}.flac")
 
-    # Rip
-    subprocess.run(["cdparanoia", str(i), wav_file], check=True)
+def tag_padding(tags, headroom=None):
+    """Size the padding block for a set of tags.
 
-    # Encode
-    subprocess.run(["flac", "--best", "-o", flac_file, wav_file], check=True)
+    Reserves the tags' own Vorbis comment size again (so every tag can be
+    corrected without growing the metadata) plus headroom for new ones.
+    """
+    if headroom is None:
+        headroom = padding_headroom
+    # Each comment is a 4-byte length followed by "KEY=value" in UTF-8
+    size = sum(4 + len(f"{key}={value}".encode("utf-8"))
+               for key, value in tags.items())
+    return size + headroom
 
-    # Tag
-    audio = FLAC(flac_file)
-    audio["title"] = title
-    audio["artist"] = artist
-    audio["album"] = album
-    audio["albumartist"] = "Various"
-    audio["date"] = year
-    audio["genre"] = genre
-    audio["tracknumber"] = str(i)
-    audio["totaltracks"] = str(len(tracks))
-    audio.save()
 
-    # Clean up WAV
-    os.remove(wav_file)
\ No newline at end of file
+def flac_encode_cmd(wav_file, flac_file, tags, picture=None,
+                    level=None, blocksize=None, padding=None):
+    """Build a flac command line that writes tags and cover art at encode time.
+
+    Vorbis comments go in via --tag and the picture via --picture, so the
+    output file is written exactly once. The padding block leaves room for
+    later metadata edits without rewriting the audio. level and blocksize
+    default to the module settings, padding to tag_padding(tags); a
+    blocksize of 0 leaves the choice to flac.
+    """
+    if level is None:
+        level = compression_level
+    if blocksize is None:
+        blocksize = block_size
+    if padding is None:
+        padding = tag_padding(tags)
+    cmd = ["flac", f"-{level}", f"--padding={padding}"]
+    if blocksize:
+        cmd.append(f"--blocksize={blocksize}")
+    for key, value in tags.items():
+        cmd.append(f"--tag={key.upper()}={value}")
+    if picture:
+        cmd.append(f"--picture={picture}")
+    cmd += ["-o", flac_file, wav_file]
+    return cmd
+
+
+if __name__ == "__main__":
+    os.makedirs(output_dir, exist_ok=True)
+    picture = cover_file if os.path.exists(cover_file) else None
+
+    for i, (artist, title) in enumerate(tracks, start=1):
+        wav_file = os.path.join(output_dir, f"track{i:02d}.wav")
+        flac_file = os.path.join(output_dir, f"{i:02d} - {artist} - {title}.flac")
+
+        # Rip
+        subprocess.run(["cdparanoia", str(i), wav_file], check=True)
+
+        # Encode and tag in one pass
+        tags = {
+            "title": title,
+            "artist": artist,
+            "album": album,
+            "albumartist": "Various",
+            "date": year,
+            "genre": genre,
+            "tracknumber": str(i),
+            "totaltracks": str(len(tracks)),
+        }
+        subprocess.run(
+            flac_encode_cmd(wav_file, flac_file, tags, picture=picture),
+            check=True)
+
+        # Clean up WAV
+        os.remove(wav_file)
\ No newline at end of file
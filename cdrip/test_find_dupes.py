@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Tests for find_dupes grouping, matching and index scoping (no ffmpeg).
+
+Run with: python -m pytest test_find_dupes.py
+"""
+
+import os
+import wave
+
+import numpy as np
+
+import find_dupes as fd
+
+
+def track(duration, title="", path="/lib/x.flac", **fields):
+    t = {"path": path, "duration": duration, "title": title, "artist": "",
+         "album": "", "trackid": "", "discid": "", "tracknumber": "",
+         "start_sha1": None, "fingerprint": None}
+    t.update(fields)
+    return t
+
+
+def write_wav(path):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(44100)
+        w.writeframes(b"\0" * 4000)
+
+
+def test_normalize():
+    assert fd.normalize("Amazing Grace (Live) [2009 Remaster]") == \
+        "amazing grace"
+    assert fd.normalize("Year's End!") == "year s end"
+    assert fd.normalize("(Intro)") == ""
+
+
+def test_title_keys():
+    assert fd.title_keys(track(0, "Leaf Dream")) == {"leaf dream"}
+    assert fd.title_keys(track(0, "John Boswell - Leaf Dream")) == \
+        {"john boswell leaf dream", "leaf dream"}
+    # Untagged: fall back to the file name, minus the track number
+    untagged = track(0, path="/lib/09 - John Boswell - Leaf Dream.mp3")
+    assert fd.title_keys(untagged) == {"john boswell leaf dream",
+                                       "leaf dream"}
+
+
+def test_candidate_groups_split_on_duration_gaps():
+    tracks = [track(100.0, "a"), track(100.8, "a"), track(101.5, "a"),
+              track(103.0, "a"), track(150.0, "a"), track(150.5, "b")]
+    # 100.0-101.5 chain within tolerance; 103.0 and 150.0 stand alone
+    assert fd.candidate_groups(tracks) == [[0, 1, 2]]
+    assert fd.candidate_groups(tracks, skip={1}) == []
+
+
+def test_pcm_matches_outlier_first():
+    tracks = [track(50.0, start_sha1="h"), track(100.0, start_sha1="h"),
+              track(100.5, start_sha1="h"), track(101.0, start_sha1="x")]
+    assert list(fd.pcm_matches(tracks, [[0, 1, 2, 3]])) == \
+        [(1, 2, "same start")]
+
+
+def test_pcm_matches_only_within_groups():
+    tracks = [track(100.0, start_sha1="h"), track(100.5, start_sha1="h")]
+    assert list(fd.pcm_matches(tracks, [])) == []
+
+
+def test_cluster():
+    pairs = [(0, 1, "tags"), (1, 2, "fingerprint"), (4, 5, "same start")]
+    clusters = sorted(fd.cluster(6, pairs))
+    assert clusters == [([0, 1, 2], {"tags", "fingerprint"}),
+                        ([4, 5], {"same start"})]
+
+
+def test_bit_error_rate_on_shifted_prints():
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 2**32, 400, dtype=np.uint32)
+    shifted = a[3:]
+    other = rng.integers(0, 2**32, 400, dtype=np.uint32)
+    assert fd.bit_error_rate(a, shifted) == 0.0
+    assert fd.bit_error_rate(shifted, a) == 0.0
+    assert fd.bit_error_rate(a, other) > 0.4
+    # Beyond MAX_OFFSET the alignment is out of reach
+    assert fd.bit_error_rate(a, a[fd.MAX_OFFSET + 1:]) > 0.4
+
+
+def test_index_scoped_to_root_not_siblings(tmp_path):
+    for name in ("My_Music", "MyXMusic", "my_music"):
+        os.makedirs(tmp_path / name)
+        write_wav(str(tmp_path / name / "b.wav"))
+    db = fd.open_index(":memory:")
+    fd.update_index(db, str(tmp_path / "MyXMusic"), workers=1)
+    fd.update_index(db, str(tmp_path / "my_music"), workers=1)
+
+    # Neither pass may delete or pick up the other directories' rows
+    assert fd.update_index(db, str(tmp_path / "My_Music"), workers=1) == \
+        (1, 0)
+    assert len(db.execute("SELECT path FROM tracks").fetchall()) == 3
+    paths = [t["path"] for t in fd.load_tracks(db, str(tmp_path / "My_Music"))]
+    assert paths == [str(tmp_path / "My_Music" / "b.wav")]
+
+
+def test_index_non_utf8_file_name(tmp_path):
+    name = os.fsdecode(b"01 - Caf\xe9.wav")
+    write_wav(str(tmp_path / name))
+    db = fd.open_index(":memory:")
+    assert fd.update_index(db, str(tmp_path), workers=1) == (1, 0)
+    assert [t["path"] for t in fd.load_tracks(db, str(tmp_path))] == \
+        [str(tmp_path / name)]
+
+
+def test_root_prefix_at_filesystem_root():
+    assert fd.root_prefix("/") == (1, b"/")
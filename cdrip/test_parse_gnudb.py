@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Check the streaming CDDB parser against the dict-based one it replaced.
+
+Run with: python -m pytest test_parse_gnudb.py
+"""
+
+from cdrip_v2 import iter_gnudb_tracks, parse_gnudb_record
+
+
+def old_parse_gnudb_record(record):
+    """The dict-based parse_gnudb_record, kept here as the reference."""
+    fields = {}
+    for line in record.strip().split("\n"):
+        if "=" in line:
+            key, _, value = line.partition("=")
+            fields[key.strip()] = value.strip()
+
+    artist = fields.get("PERFORMER") or fields.get("ARTIST", "Unknown Artist")
+    album = fields.get("ALBUM", "Unknown Album")
+
+    track_titles = {}
+    for key, value in fields.items():
+        if key.startswith("TTITLE"):
+            track_titles[int(key[6:])] = value
+
+    tracks = []
+    for i in sorted(track_titles):
+        title = track_titles[i]
+        track_artist = artist
+        if " - " in title:
+            parts = title.split(" - ", 1)
+            if parts[0] != artist and not parts[0].startswith("Part"):
+                track_artist = parts[0]
+                title = parts[1]
+        tracks.append({"disc": 1, "number": i + 1, "title": title,
+                       "artist": track_artist, "album": album})
+    return tracks
+
+
+SAMPLES = {
+    "plain": "# xmcd\nPERFORMER=Band\nALBUM=Album\nYEAR=2009\n"
+             "TTITLE0=One\nTTITLE1=Two\n.\n",
+    "crlf": "PERFORMER=Band\r\nALBUM=Album\r\nTTITLE0=One\r\n",
+    "artist fallback": "ARTIST=Solo\nTTITLE0=Only\n",
+    "no artist": "TTITLE0=Only\n",
+    "late header": "TTITLE0=x\nTTITLE1=y\nPERFORMER=Late\nALBUM=Later\n",
+    "out of order": "PERFORMER=Band\nTTITLE0=a\nTTITLE2=c\nTTITLE1=b\n",
+    "track artists": "PERFORMER=Various\nTTITLE0=John Doan - Amazing Grace\n"
+                     "TTITLE1=Part 1 - Overture\nTTITLE2=Various - Medley\n",
+    "padded": "PERFORMER = Band \nTTITLE0 =  Spaced  \n",
+}
+
+
+def as_dicts(tracks):
+    return [track._asdict() for track in tracks]
+
+
+def test_matches_old_parser():
+    for name, record in SAMPLES.items():
+        assert as_dicts(iter_gnudb_tracks(record)) == \
+            old_parse_gnudb_record(record), name
+
+
+def test_parse_gnudb_record_returns_same_tracks():
+    record = SAMPLES["track artists"]
+    assert parse_gnudb_record(record) == list(iter_gnudb_tracks(record))
+
+
+def test_continuation_lines_are_joined():
+    # The old parser kept only the last line of a split TTITLE
+    record = ("PERFORMER=Band\nTTITLE0=A very long ti\nTTITLE0=tle, \n"
+              "TTITLE1=Two\nTTITLE0=continued\n")
+    assert [t["title"] for t in old_parse_gnudb_record(record)] == \
+        ["continued", "Two"]
+    assert [t.title for t in iter_gnudb_tracks(record)] == \
+        ["A very long title, continued", "Two"]
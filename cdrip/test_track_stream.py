@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Tests for the batch output writers and rerun handling.
+
+Run with: python -m pytest test_track_stream.py
+"""
+
+import json
+
+from track_stream import (TrackRow, resume_jsonl, sqlite_disc_ids,
+                          write_jsonl, write_sqlite)
+
+
+def disc(disc_id, tracks=3):
+    return [TrackRow(disc_id, f"rel-{disc_id}", 1, n, f"T{n}", "A", "B")
+            for n in range(1, tracks + 1)]
+
+
+def test_resume_jsonl_drops_cut_short_disc(tmp_path):
+    path = tmp_path / "out.jsonl"
+    with open(path, "w") as f:
+        write_jsonl([disc("d1"), disc("d2"), disc("d3")], f)
+    # Interrupted partway through d3's last line
+    path.write_bytes(path.read_bytes()[:-10])
+
+    assert resume_jsonl(str(path)) == {"d1", "d2"}
+    rows = [json.loads(line) for line in open(path)]
+    assert [r["disc_id"] for r in rows] == ["d1"] * 3 + ["d2"] * 3
+
+    with open(path, "a") as f:
+        write_jsonl([disc("d3")], f)
+    assert resume_jsonl(str(path)) == {"d1", "d2"}
+    assert len(open(path).readlines()) == 6
+
+
+def test_resume_jsonl_missing_file(tmp_path):
+    assert resume_jsonl(str(tmp_path / "none.jsonl")) == set()
+
+
+def test_write_sqlite_keeps_committed_discs(tmp_path):
+    path = str(tmp_path / "out.sqlite")
+
+    def interrupted():
+        yield disc("d1")
+        yield disc("d2")
+        yield disc("d3")
+        raise KeyboardInterrupt
+
+    try:
+        write_sqlite(interrupted(), path, batch=2)
+    except KeyboardInterrupt:
+        pass
+    # d3 was in the uncommitted batch
+    assert sqlite_disc_ids(path) == {"d1", "d2"}
+    assert write_sqlite([disc("d3")], path) == 3
+    assert sqlite_disc_ids(path) == {"d1", "d2", "d3"}
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Compact track records and streaming writers for batch metadata jobs."""
+
+import json
+import os
+import sqlite3
+from collections import namedtuple
+from contextlib import closing
+
+# Tuple-backed, so no per-track dict; fields match the old track dicts.
+Track = namedtuple("Track", ["disc", "number", "title", "artist", "album"])
+
+# A Track as written by a batch job, tagged with where it came from so
+# rows can be told apart and a rerun can skip discs already done.
+TrackRow = namedtuple("TrackRow",
+                      ["disc_id", "release_id"] + list(Track._fields))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    disc_id     TEXT,
+    release_id  TEXT,
+    disc        INTEGER,
+    number      INTEGER,
+    title       TEXT,
+    artist      TEXT,
+    album       TEXT
+)
+"""
+
+
+def write_jsonl(discs, f):
+    """Write each disc's TrackRows to an open text file as JSON lines.
+
+    discs is an iterable of per-disc lists, written as they arrive.
+    Returns the number of tracks written.
+    """
+    count = 0
+    for rows in discs:
+        for row in rows:
+            f.write(json.dumps(row._asdict()) + "\n")
+        f.flush()
+        count += len(rows)
+    return count
+
+
+def write_sqlite(discs, path, batch=50):
+    """Append each disc's TrackRows to a SQLite database.
+
+    discs is an iterable of per-disc lists. Commits every batch discs,
+    never mid-disc, so an interrupted job keeps every disc up to its
+    last commit and no partial ones. Returns the number of tracks written.
+    """
+    count = 0
+    with closing(sqlite3.connect(path)) as db:
+        db.execute(SCHEMA)
+        # Closing without a commit drops only the batch in flight
+        for n, rows in enumerate(discs, 1):
+            db.executemany(
+                "INSERT INTO tracks VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            count += len(rows)
+            if n % batch == 0:
+                db.commit()
+        db.commit()
+    return count
+
+
+def sqlite_disc_ids(path):
+    """Return the set of disc IDs already written to a SQLite output."""
+    if not os.path.exists(path):
+        return set()
+    with closing(sqlite3.connect(path)) as db:
+        db.execute(SCHEMA)
+        return {disc_id for (disc_id,) in
+                db.execute("SELECT DISTINCT disc_id FROM tracks")}
+
+
+def resume_jsonl(path):
+    """Prepare a JSON lines output for appending; return disc IDs done.
+
+    The file is read a line at a time. The last disc in it may have been
+    cut short by an interruption (possibly mid-line), so its rows are
+    truncated away and it isn't counted as done.
+    """
+    if not os.path.exists(path):
+        return set()
+
+    done = set()
+    last_id = None
+    last_start = 0
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if line.endswith(b"\n"):
+                disc_id = json.loads(line)["disc_id"]
+                if disc_id != last_id:
+                    if last_id is not None:
+                        done.add(last_id)
+                    last_id, last_start = disc_id, offset
+            offset += len(line)
+
+    with open(path, "r+b") as f:
+        f.truncate(last_start)
+    return done